@@ -91,7 +91,7 @@ CAMERA_SWITCH_INTERVAL = float(os.environ.get("CAMERA_SWITCH_INTERVAL", "20"))
 
 # ---------------------------------------------------------------------------
 # Camera reader thread
-# The only thread that ever calls camera_input.read_latest().
+# The only thread that ever reads from a CameraInput.
 # Writes new frames into state and signals all waiting generators.
 #
 # When two cameras are configured, the loop auto-switches between them on a
@@ -101,7 +101,9 @@ CAMERA_SWITCH_INTERVAL = float(os.environ.get("CAMERA_SWITCH_INTERVAL", "20"))
 # no cold-start delay.
 # ---------------------------------------------------------------------------
 
-EMOTION_FPS = 18
+# Per-face EMA smoothing in EmotionDetector hides the lower update rate, so
+# inference does not need to track the camera's full frame rate.
+EMOTION_FPS = 10
 
 def _camera_reader_loop():
     multi       = len(camera_inputs) > 1
@@ -130,31 +132,92 @@ def _camera_reader_loop():
             time.sleep(0.1)
             continue
 
-        ret, frame = active.read_latest()
-        if ret and frame is not None:
-            flipped = cv2.flip(frame, 1)
+        # Mirror while copying out of the GStreamer buffer — no second W·H·3 copy.
+        ret, flipped = active.read_flipped()
+        if ret and flipped is not None:
             with _state.frame_condition:
-                _state.latest_frame         = frame
                 _state.latest_frame_flipped = flipped
                 _state.frame_timestamp      = time.time()
                 _state.frame_seq           += 1
                 _state.frame_condition.notify_all()
 
     with _state.frame_condition:
-        _state.latest_frame         = None
         _state.latest_frame_flipped = None
         _state.frame_condition.notify_all()
     print("[camera] Reader thread stopped")
 
 
+# ---------------------------------------------------------------------------
+# JPEG encoder thread
+# Encodes each new camera frame once and publishes the bytes to state, so
+# /video_feed costs one cv2.imencode per frame regardless of viewer count.
+# Idles while no /video_feed client is connected.
+# ---------------------------------------------------------------------------
+
+_jpeg_params        = [cv2.IMWRITE_JPEG_QUALITY, _state.STREAM_JPEG_QUALITY,
+                       cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+_JPEG_LOG_INTERVAL  = 30   # log every N encoded frames (~1 s at 30 fps)
+
+def _jpeg_encoder_loop():
+    last_seq    = -1
+    frame_count = 0
+    print("[jpeg] Encoder thread started (idle — waiting for /video_feed client)")
+    while not _state.stop_event.is_set():
+        if _state.jpeg_active_clients == 0:
+            # Drop the last JPEG so it can't be served stale to the next client,
+            # and re-encode the current frame as soon as one connects.
+            if _state.latest_jpeg is not None:
+                with _state.jpeg_condition:
+                    _state.latest_jpeg = None
+            last_seq = -1
+            time.sleep(0.1)
+            continue
+
+        with _state.frame_condition:
+            _state.frame_condition.wait_for(
+                lambda: _state.frame_seq != last_seq, timeout=1.0
+            )
+            frame     = _state.latest_frame_flipped
+            is_new    = _state.frame_seq != last_seq
+            last_seq  = _state.frame_seq
+            frame_age = time.time() - _state.frame_timestamp if _state.frame_timestamp else 0
+
+        # Timed out on a live camera — the published JPEG is still current.
+        if frame is not None and not is_new:
+            continue
+
+        jpeg = None
+        if frame is not None:
+            t_enc = time.time()
+            ret, buf = cv2.imencode('.jpg', frame, _jpeg_params)
+            if ret:
+                jpeg = buf.tobytes()
+            frame_count += 1
+            if frame_count % _JPEG_LOG_INTERVAL == 0:
+                encode_ms = (time.time() - t_enc) * 1000
+                print(f'[jpeg] #{frame_count}  frame_age={frame_age*1000:.0f}ms  '
+                      f'encode={encode_ms:.1f}ms  clients={_state.jpeg_active_clients}')
+
+        with _state.jpeg_condition:
+            _state.latest_jpeg = jpeg
+            _state.jpeg_seq   += 1
+            _state.jpeg_condition.notify_all()
+    print("[jpeg] Encoder thread stopped")
+
+
 # ---------------------------------------------------------------------------
 # Emotion inference thread
-# Runs at EMOTION_FPS, reads the latest frame from state, writes results back.
+# Runs at up to EMOTION_FPS, reads the latest frame from state, writes results
+# back.  Each pass waits for a frame it has not analysed yet, then sleeps only
+# until the next monotonic deadline, so inference time does not stretch the
+# period and a slow camera is never re-analysed on a stale frame.
 # ---------------------------------------------------------------------------
 
 def _emotion_inference_loop():
     interval  = 1.0 / EMOTION_FPS
     dbg_count = 0
+    last_seq  = -1
+    next_run  = time.monotonic()
     print("[emotion] Inference thread started (idle — waiting for active client)")
     while not _state.stop_event.is_set():
         # Idle cheaply when nothing is consuming emotion results.
@@ -166,16 +229,26 @@ def _emotion_inference_loop():
             time.sleep(0.1)
             continue
 
+        delay = next_run - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_run = max(next_run + interval, time.monotonic())
+
         with _state.frame_condition:
-            frame = _state.latest_frame_flipped
-        if frame is not None:
-            result = emotion_detector.detect_emotions_from_frame(frame, silent=True)
+            _state.frame_condition.wait_for(
+                lambda: _state.frame_seq != last_seq, timeout=1.0
+            )
+            frame    = _state.latest_frame_flipped
+            is_new   = _state.frame_seq != last_seq
+            last_seq = _state.frame_seq
+        if frame is not None and is_new:
+            result = emotion_detector.detect_emotions_from_frame(frame)
             h, w = frame.shape[:2]
             result['frame_width']  = w
             result['frame_height'] = h
-            with _state.emotion_result_lock:
-                _state.latest_emotion_result.clear()
-                _state.latest_emotion_result.update(result)
+            # Publish by swapping the reference — readers never see a
+            # half-updated dict and need no lock or copy.
+            _state.latest_emotion_result = result
             # Signal the Socket.IO broadcaster that a new result is available.
             with _state.emotion_condition:
                 _state.emotion_condition.notify_all()
@@ -184,8 +257,6 @@ def _emotion_inference_loop():
                 n   = len(result.get('faces', []))
                 err = result.get('error', '')
                 print(f"[emotion] #{dbg_count} face_detected={result.get('face_detected')} faces={n} clients={_state.emotion_active_clients} err={err!r}")
-
-        time.sleep(interval)
     print("[emotion] Inference thread stopped")
 
 
@@ -253,6 +324,7 @@ def initialize_system():
 
     # Camera reader runs immediately; /video_feed is usable from this point.
     threading.Thread(target=_camera_reader_loop, daemon=True, name="camera-reader").start()
+    threading.Thread(target=_jpeg_encoder_loop, daemon=True, name="jpeg-encoder").start()
 
     # ------------------------------------------------------------------
     # Phase 2: models (inference stays idle until a route activates it)
@@ -1,4 +1,6 @@
 import os
+
+import cv2
 import numpy as np
 
 # GStreamer is imported LAZILY inside _initialize_camera() to avoid loading
@@ -244,6 +246,19 @@ class CameraInput:
         - The call blocks naturally at the camera's capture FPS — no
           time.sleep() needed in the caller.
         """
+        return self._pull_frame(flip=False)
+
+    def read_flipped(self):
+        """
+        Like read_latest(), but returns the frame mirrored horizontally.
+
+        The flip is done while copying out of the mapped GStreamer buffer, so
+        the mirrored frame costs one W·H·3 pass instead of a copy plus a
+        separate cv2.flip().
+        """
+        return self._pull_frame(flip=True)
+
+    def _pull_frame(self, flip):
         if not self._opened or self._sink is None:
             return False, None
 
@@ -263,13 +278,11 @@ class CameraInput:
         try:
             arr    = np.frombuffer(map_info.data, dtype=np.uint8)
             stride = map_info.size // h  # actual bytes per row (may include padding)
-            if stride != w * 3:
-                # Row padding present — strip it before reshaping to avoid tearing.
-                frame = np.ascontiguousarray(
-                    arr.reshape(h, stride)[:, : w * 3].reshape(h, w, 3)
-                )
-            else:
-                frame = arr.reshape(h, w, 3).copy()
+            # Slice each row to w*3 bytes so any row padding is dropped (no-op
+            # when stride == w*3) — reshaping with padding would tear the image.
+            view   = arr.reshape(h, stride)[:, : w * 3].reshape(h, w, 3)
+            # Both branches copy out of the mapped buffer before it is unmapped.
+            frame  = cv2.flip(view, 1) if flip else view.copy()
         except Exception:
             return False, None
         finally:
@@ -285,7 +298,6 @@ class CameraInput:
 
     def _debug_frame(self, frame: np.ndarray):
         """Write a single debug frame to disk (called only while FRAME_DEBUG is True)."""
-        import cv2
         self._debug_saved += 1
         path = os.path.join(FRAME_DEBUG_DIR, f'frame_{self._debug_saved:04d}.jpg')
         cv2.imwrite(path, frame)
@@ -1,12 +1,30 @@
+import os
+
 import cv2
 from deepface import DeepFace
-from emotion_transforms import emotions_to_color
+from emotion_detection.onnx_emotion import OnnxEmotionModel
+from emotion_detection.tflite_emotion import TFLiteEmotionModel
+from emotion_transforms import EMOTION_KEYS, emotion_weights, emotions_to_color_arr
 import numpy as np
-from collections import deque
-
-# Number of consecutive frames to average per tracked face.
-# Higher = smoother labels, slightly more lag on real expression changes.
-_SMOOTH_WINDOW = 4
+from collections import OrderedDict
+
+# DeepFace face-detector backend.  YuNet is a ~1 MB CNN run through
+# cv2.FaceDetectorYN — a few ms per frame on CPU versus tens of ms for
+# RetinaFace, and still robust to tilted faces.  Set
+# EMOTION_DETECTOR_BACKEND=retinaface to trade speed for recall on small faces.
+_DETECTOR_BACKEND = os.environ.get('EMOTION_DETECTOR_BACKEND', 'yunet')
+
+# Optional alternative runtimes for the emotion CNN, exported by
+# emotion_detection/onnx_emotion.py and emotion_detection/tflite_emotion.py.
+# ONNX (GPU via onnxruntime providers) wins if both are set; when neither is,
+# DeepFace's float32 Keras model is used.
+_ONNX_MODEL_PATH   = os.environ.get('EMOTION_ONNX_MODEL') or None
+_TFLITE_MODEL_PATH = os.environ.get('EMOTION_TFLITE_MODEL') or None
+
+# Weight of the newest frame in each track's exponential moving average.
+# Lower = smoother labels, more lag on real expression changes.  The EMA
+# hides jitter well enough that inference can run at a reduced rate.
+_EMA_ALPHA = 0.3
 
 # Minimum IoU to consider a new detection as the same face as an existing track.
 _IOU_MATCH_THRESHOLD = 0.25
@@ -14,6 +32,28 @@ _IOU_MATCH_THRESHOLD = 0.25
 # Frames a track can go unmatched before it is discarded.
 _MAX_TRACK_AGE = 2
 
+# Inference cache — DeepFace results keyed on a dHash of each face ROI.
+# When every tracked face still hashes to a cached entry the forward pass is
+# skipped and the cached emotions are replayed through the tracker.
+_EMOTION_CACHE_SIZE = 64
+# A cached entry only counts as a hit if its bbox is within this many pixels
+# of the track's current bbox.
+_CACHE_MAX_SHIFT_PX = 20
+# Force a full DeepFace pass after this many consecutive cache hits so faces
+# entering the frame (which have no track to hash yet) are still picked up.
+_CACHE_MAX_CONSECUTIVE_HITS = 10
+
+# Frames are downscaled by this factor before DeepFace so the detector walks
+# 4x fewer pixels; bboxes are scaled back to full-frame coordinates.  The
+# emotion model classifies 48x48 crops, so faces keep enough detail.
+_DETECT_SCALE = 0.5
+# Frames narrower than this are analysed at full resolution.
+_DETECT_SCALE_MIN_WIDTH = 480
+
+# Output order of DeepFace's emotion CNN softmax, and its input edge length.
+_DEEPFACE_EMOTION_LABELS = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+_EMOTION_INPUT_SIZE = 48
+
 
 def _iou(a, b):
     """Intersection-over-Union for two bboxes given as (x, y, w, h)."""
@@ -28,40 +68,86 @@ def _iou(a, b):
     return inter / union if union > 0 else 0.0
 
 
+def _roi_dhash(frame, bbox):
+    """64-bit difference hash of the BGR face ROI, or None for an empty crop."""
+    x, y, w, h = bbox
+    roi = frame[max(0, y):y + h, max(0, x):x + w]
+    if roi.size == 0:
+        return None
+    small = cv2.resize(roi, (9, 8), interpolation=cv2.INTER_AREA)
+    gray  = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return (gray[:, 1:] > gray[:, :-1]).tobytes()
+
+
+def _as_gray_u8(crop):
+    """
+    Coerce a face crop to 2-D uint8.
+
+    cv2.resize only writes into a preallocated dst of matching type; any
+    other crop would make it allocate a fresh array and leave the scratch
+    buffer black.  Float crops in 0-1 are rescaled to 0-255.
+    """
+    if crop.ndim == 3:
+        if crop.shape[2] == 1:
+            crop = crop[:, :, 0]
+        else:
+            crop = cv2.cvtColor(crop.astype(np.float32, copy=False), cv2.COLOR_BGR2GRAY)
+    if crop.dtype != np.uint8:
+        if crop.size and crop.max() <= 1.0:
+            crop = crop * 255.0
+        crop = np.clip(crop, 0, 255).astype(np.uint8)
+    return crop
+
+
 class _FaceTrack:
-    """Tracks a single face and smooths its emotion scores over a rolling window."""
+    """Tracks a single face and smooths its emotion scores with an EMA."""
 
     def __init__(self, bbox, emotions):
-        self.bbox = bbox
-        self.history: deque = deque(maxlen=_SMOOTH_WINDOW)
-        self.history.append(emotions)
-        self.age = 0
+        self.ema = None
+        self.update(bbox, emotions)
 
     def update(self, bbox, emotions):
         self.bbox = bbox
-        self.history.append(emotions)
+        scores = emotion_weights(emotions)
+        if self.ema is None:
+            self.ema = scores
+        else:
+            self.ema = (1.0 - _EMA_ALPHA) * self.ema + _EMA_ALPHA * scores
         self.age = 0
 
+    @property
+    def smoothed_scores(self):
+        """EMA-smoothed scores (0-100) as a vector in EMOTION_KEYS order."""
+        return self.ema
+
     @property
     def smoothed_emotions(self):
-        keys = self.history[0].keys()
-        return {k: float(np.mean([h[k] for h in self.history])) for k in keys}
+        """EMA-smoothed scores as an {emotion: score} dict."""
+        return {k: float(v) for k, v in zip(EMOTION_KEYS, self.smoothed_scores)}
 
 
 class EmotionDetector:
     """
     Multi-face emotion detector with temporal smoothing.
 
-    Uses RetinaFace (via DeepFace) for face detection — significantly more
-    accurate than Haar cascades, handles angles and partial occlusion well.
-    Emotions are averaged over a rolling window per tracked face to reduce
-    frame-to-frame jitter.
+    Uses YuNet (via DeepFace / cv2.FaceDetectorYN) for face detection — a
+    small CNN that is faster than RetinaFace and far more accurate than Haar
+    cascades on tilted or partially occluded faces.
+    Emotions are smoothed with an exponential moving average per tracked
+    face to reduce frame-to-frame jitter.
     """
 
     def __init__(self, load_models_on_init=False):
         self.models_loaded = False
         self._tracks: list = []
         self._logged_keys = False
+        self._emotion_cache: OrderedDict = OrderedDict()   # dhash -> (bbox, emotions)
+        self._cache_hits_in_row = 0
+        self._predict_fn = None   # (N, 48, 48, 1) -> (N, 7) softmax; built on first use
+        # Reused emotion-model inputs: a uint8 letterbox scratch and a float32
+        # batch that grows only when more faces appear than ever before.
+        self._roi_u8  = np.zeros((_EMOTION_INPUT_SIZE, _EMOTION_INPUT_SIZE), dtype=np.uint8)
+        self._roi_buf = np.zeros((1, _EMOTION_INPUT_SIZE, _EMOTION_INPUT_SIZE, 1), dtype=np.float32)
 
         if load_models_on_init:
             self.load_models()
@@ -69,19 +155,23 @@ class EmotionDetector:
     def load_models(self):
         """Warm up DeepFace / TensorFlow so the first real frame is fast."""
         print("Loading emotion detection models...")
+        # Built outside the warmup's catch-all: if no emotion backend can be
+        # loaded, report failure so inference never starts.
+        try:
+            predict = self._emotion_predictor()
+        except Exception as e:
+            print(f"Error loading emotion model: {e}")
+            return False
         try:
             test_frame = np.ones((480, 640, 3), dtype=np.uint8) * 128
             try:
-                DeepFace.analyze(
-                    test_frame,
-                    actions=['emotion'],
-                    detector_backend='retinaface',
-                    model_name='Facenet512',
-                    enforce_detection=False,
-                    silent=True,
-                )
+                self._run_deepface(test_frame)
+                blank = np.zeros((1, _EMOTION_INPUT_SIZE, _EMOTION_INPUT_SIZE, 1), dtype=np.float32)
+                predict(blank)
             except Exception as e:
                 print(f"Model warmup triggered (expected: {type(e).__name__})")
+            # The warmup frame has no face; keep the key log for the first real one.
+            self._logged_keys = False
             self.models_loaded = True
             print("Models loaded successfully")
             return True
@@ -92,13 +182,12 @@ class EmotionDetector:
                 return True
             return False
 
-    def detect_emotions_from_frame(self, frame, silent=True):
+    def detect_emotions_from_frame(self, frame):
         """
         Detect emotions for every face visible in the frame.
 
         Args:
             frame: BGR frame from OpenCV (numpy array)
-            silent: Suppress DeepFace log output
 
         Returns:
             dict: {
@@ -116,53 +205,11 @@ class EmotionDetector:
             }
         """
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            raw = DeepFace.analyze(
-                rgb_frame,
-                actions=['emotion'],
-                detector_backend='retinaface',
-                enforce_detection=False,
-                align=True,
-                silent=silent,
-            )
-
-            # DeepFace always returns a list; guard against unexpected formats.
-            if not raw:
-                self._age_tracks(matched=set())
-                return {'face_detected': False, 'faces': []}
-            if isinstance(raw, dict):
-                raw = [raw]
-
-            # Debug: log keys and facial_area on first call to identify key names.
-            if not getattr(self, '_logged_keys', False):
-                self._logged_keys = True
-                sample = raw[0] if raw else {}
-                fa_sample = sample.get('facial_area') or sample.get('region') or {}
-                print(f"[emotion_detector] DeepFace result keys: {list(sample.keys())}")
-                print(f"[emotion_detector] facial_area/region: {fa_sample}")
-                print(f"[emotion_detector] face_confidence: {sample.get('face_confidence', 'N/A')}")
-
-            # --- build (bbox, emotions) pairs from DeepFace output ---
-            detections = []
-            for r in raw:
-                # Support both 'facial_area' (newer DeepFace) and 'region' (older)
-                fa = r.get('facial_area') or r.get('region') or {}
-                bbox = (
-                    int(fa.get('x', 0)),
-                    int(fa.get('y', 0)),
-                    int(fa.get('w', 0)),
-                    int(fa.get('h', 0)),
-                )
-                # Filter out zero-confidence "no face found" placeholders that
-                # DeepFace inserts when enforce_detection=False finds nothing.
-                confidence = float(r.get('face_confidence', 1.0))
-                if confidence < 0.5:
-                    continue
-                # Also skip degenerate bboxes
-                if bbox[2] < 20 or bbox[3] < 20:
-                    continue
-                detections.append((bbox, r['emotion']))
+            detections = self._cached_detections(frame)
+            if detections is None:
+                self._cache_hits_in_row = 0
+                detections = self._run_deepface(frame)
+                self._remember_detections(frame, detections)
 
             if not detections:
                 self._age_tracks(matched=set())
@@ -202,12 +249,12 @@ class EmotionDetector:
                 if idx >= len(self._tracks):
                     continue
                 track = self._tracks[idx]
-                smoothed = track.smoothed_emotions
-                dominant = max(smoothed, key=smoothed.get)
-                color_rgb = emotions_to_color(smoothed)
+                scores    = track.smoothed_scores
+                dominant  = EMOTION_KEYS[int(np.argmax(scores))]
+                color_rgb = emotions_to_color_arr(scores * (1 / 100.0))
                 color_bgr = (int(color_rgb[2]), int(color_rgb[1]), int(color_rgb[0]))
                 faces_out.append({
-                    'emotions': smoothed,
+                    'emotions': track.smoothed_emotions,
                     'dominant_emotion': dominant,
                     'emotion_color_rgb': color_rgb,
                     'emotion_color_bgr': color_bgr,
@@ -223,6 +270,162 @@ class EmotionDetector:
             print(f"Error in emotion detection: {e}")
             return {'face_detected': False, 'faces': [], 'error': str(e)}
 
+    def _emotion_predictor(self):
+        """
+        Return the batched emotion forward pass — ONNX or TFLite if configured, else Keras.
+
+        A configured backend that fails to load (missing file, runtime not
+        installed) falls back to Keras once with a warning; the result is
+        kept, so a bad backend is never retried per frame.
+        """
+        if self._predict_fn is None:
+            predict = None
+            for label, path, backend in (('ONNX',   _ONNX_MODEL_PATH,   OnnxEmotionModel),
+                                         ('TFLite', _TFLITE_MODEL_PATH, TFLiteEmotionModel)):
+                if not path:
+                    continue
+                try:
+                    predict = backend(path).predict
+                    print(f"[emotion_detector] Using {label} emotion model {path}")
+                except Exception as e:
+                    print(f"[emotion_detector] WARNING: {label} emotion model {path} "
+                          f"failed to load ({type(e).__name__}: {e}) — falling back to Keras")
+                break
+            if predict is None:
+                model   = DeepFace.build_model('Emotion', task='facial_attribute').model
+                predict = lambda batch: model(batch, training=False).numpy()
+            self._predict_fn = predict
+        return self._predict_fn
+
+    def _run_deepface(self, frame):
+        """
+        Detect faces with DeepFace and return a list of (bbox, emotions).
+
+        All face crops are classified in a single batched forward pass of the
+        emotion CNN instead of one DeepFace.analyze call per face.
+        """
+        scale = _DETECT_SCALE if frame.shape[1] >= _DETECT_SCALE_MIN_WIDTH else 1.0
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        # DeepFace treats numpy input as BGR (OpenCV order), so the camera
+        # frame is passed straight through — no full-frame colour conversion.
+        faces = DeepFace.extract_faces(
+            frame,
+            detector_backend=_DETECTOR_BACKEND,
+            enforce_detection=False,
+            align=True,
+            color_face='gray',
+            normalize_face=False,
+        )
+        if not faces:
+            return []
+
+        # Debug: log keys and facial_area on first call to identify key names.
+        if not getattr(self, '_logged_keys', False):
+            self._logged_keys = True
+            sample = faces[0]
+            print(f"[emotion_detector] DeepFace face keys: {list(sample.keys())}")
+            print(f"[emotion_detector] facial_area: {sample.get('facial_area', {})}")
+            print(f"[emotion_detector] confidence: {sample.get('confidence', 'N/A')}")
+
+        # --- collect full-frame bboxes and emotion-model crops ---
+        bboxes, crops = [], []
+        for f in faces:
+            fa = f.get('facial_area') or {}
+            bbox = (
+                int(fa.get('x', 0) / scale),
+                int(fa.get('y', 0) / scale),
+                int(fa.get('w', 0) / scale),
+                int(fa.get('h', 0) / scale),
+            )
+            # Filter out zero-confidence "no face found" placeholders that
+            # DeepFace inserts when enforce_detection=False finds nothing.
+            confidence = float(f.get('confidence', 1.0))
+            if confidence < 0.5:
+                continue
+            # Also skip degenerate bboxes
+            if bbox[2] < 20 or bbox[3] < 20:
+                continue
+            if f['face'].size == 0:
+                continue
+            bboxes.append(bbox)
+            crops.append(f['face'])
+
+        if not crops:
+            return []
+
+        # --- one forward pass for every face ---
+        probs = self._emotion_predictor()(self._fill_roi_batch(crops))
+        probs = 100.0 * probs / probs.sum(axis=1, keepdims=True)
+
+        return [
+            (bbox, {label: float(p) for label, p in zip(_DEEPFACE_EMOTION_LABELS, row)})
+            for bbox, row in zip(bboxes, probs)
+        ]
+
+    def _fill_roi_batch(self, crops):
+        """
+        Write grayscale uint8 face crops into the reused emotion-model batch.
+
+        Mirrors DeepFace's own preprocessing — letterbox to a square with
+        black padding, resize to 48x48, scale to 0-1 — but resizes straight
+        into the preallocated scratch buffer instead of allocating per face.
+        Returns a (len(crops), 48, 48, 1) view of self._roi_buf.
+        """
+        n = len(crops)
+        if n > self._roi_buf.shape[0]:
+            self._roi_buf = np.zeros((n, _EMOTION_INPUT_SIZE, _EMOTION_INPUT_SIZE, 1), dtype=np.float32)
+
+        size = _EMOTION_INPUT_SIZE
+        for i, crop in enumerate(crops):
+            crop = _as_gray_u8(crop)
+            h, w = crop.shape
+            rw   = max(1, round(w * size / max(h, w)))
+            rh   = max(1, round(h * size / max(h, w)))
+            top, left = (size - rh) // 2, (size - rw) // 2
+            self._roi_u8.fill(0)
+            cv2.resize(crop, (rw, rh), dst=self._roi_u8[top:top + rh, left:left + rw])
+            np.multiply(self._roi_u8, 1 / 255.0, out=self._roi_buf[i, :, :, 0], dtype=np.float32)
+        return self._roi_buf[:n]
+
+    def _cached_detections(self, frame):
+        """
+        Return cached (bbox, emotions) pairs if every tracked face is unchanged.
+
+        Each track's ROI is re-hashed at its last bbox; the frame is a hit only
+        when all of them are in the cache at roughly the same position.
+        Returns None on a miss, meaning DeepFace has to run.
+        """
+        if not self._tracks or self._cache_hits_in_row >= _CACHE_MAX_CONSECUTIVE_HITS:
+            return None
+
+        detections = []
+        for track in self._tracks:
+            key   = _roi_dhash(frame, track.bbox)
+            entry = self._emotion_cache.get(key) if key is not None else None
+            if entry is None:
+                return None
+            bbox, emotions = entry
+            if max(abs(bbox[0] - track.bbox[0]), abs(bbox[1] - track.bbox[1])) > _CACHE_MAX_SHIFT_PX:
+                return None
+            self._emotion_cache.move_to_end(key)
+            detections.append((bbox, emotions))
+
+        self._cache_hits_in_row += 1
+        return detections
+
+    def _remember_detections(self, frame, detections):
+        """Store fresh DeepFace detections in the LRU, evicting the oldest."""
+        for bbox, emotions in detections:
+            key = _roi_dhash(frame, bbox)
+            if key is None:
+                continue
+            self._emotion_cache[key] = (bbox, emotions)
+            self._emotion_cache.move_to_end(key)
+        while len(self._emotion_cache) > _EMOTION_CACHE_SIZE:
+            self._emotion_cache.popitem(last=False)
+
     def _age_tracks(self, matched: set):
         """Increment age of unmatched tracks and prune stale ones."""
         for i, track in enumerate(self._tracks):
@@ -232,6 +435,7 @@ class EmotionDetector:
 
     def cleanup(self):
         self._tracks.clear()
+        self._emotion_cache.clear()
         self.models_loaded = False
         print("EmotionDetector cleaned up")
 
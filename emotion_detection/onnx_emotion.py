@@ -0,0 +1,62 @@
+"""
+ONNX Runtime build of DeepFace's emotion CNN.
+
+Export once (needs tf2onnx):
+
+    python -m emotion_detection.onnx_emotion emo.onnx
+
+then point the app at it with EMOTION_ONNX_MODEL=emo.onnx.  Inference needs
+onnxruntime (or onnxruntime-gpu for CUDA); neither is imported unless the
+variable is set.
+
+The session uses the first available accelerator from _PREFERRED_PROVIDERS
+and falls back to CPU.  Input/output match the Keras model:
+(N, 48, 48, 1) grayscale float32 in 0-1 → (N, 7) softmax.
+"""
+import sys
+
+import numpy as np
+
+_INPUT_SIZE = 48
+
+_PREFERRED_PROVIDERS = (
+    'CUDAExecutionProvider',       # NVIDIA GPU
+    'CoreMLExecutionProvider',     # Apple silicon
+    'OpenVINOExecutionProvider',   # Intel CPU / iGPU
+    'CPUExecutionProvider',
+)
+
+
+def export(output_path):
+    """Export the DeepFace emotion model to ONNX at output_path."""
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    keras_model = DeepFace.build_model('Emotion', task='facial_attribute').model
+    spec = (tf.TensorSpec((None, _INPUT_SIZE, _INPUT_SIZE, 1), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, output_path=output_path)
+    print(f"[onnx] Wrote emotion model → {output_path}")
+
+
+class OnnxEmotionModel:
+    """Runs an exported emotion model through onnxruntime."""
+
+    def __init__(self, model_path):
+        import onnxruntime as ort
+        available   = set(ort.get_available_providers())
+        providers   = [p for p in _PREFERRED_PROVIDERS if p in available]
+        self._sess  = ort.InferenceSession(model_path, providers=providers)
+        self._input = self._sess.get_inputs()[0].name
+        print(f"[onnx] Emotion model providers: {self._sess.get_providers()}")
+
+    def predict(self, batch):
+        """(N, 48, 48, 1) float32 → (N, 7) softmax probabilities."""
+        return self._sess.run(None, {self._input: batch.astype(np.float32, copy=False)})[0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m emotion_detection.onnx_emotion OUTPUT.onnx")
+        sys.exit(1)
+    export(sys.argv[1])
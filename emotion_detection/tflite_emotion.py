@@ -0,0 +1,84 @@
+"""
+TFLite INT8 build of DeepFace's emotion CNN.
+
+Convert once (calibration images are optional but needed for full INT8):
+
+    python -m emotion_detection.tflite_emotion emo_int8.tflite [face_images_dir]
+
+then point the app at it with EMOTION_TFLITE_MODEL=emo_int8.tflite.
+
+With a calibration directory every op is quantized to INT8 using the images
+as the representative dataset.  Without one the converter falls back to
+dynamic-range quantization (INT8 weights, float activations).  Either way
+the model keeps float32 input/output, so it is a drop-in replacement for
+the Keras model: (N, 48, 48, 1) grayscale in 0-1 → (N, 7) softmax.
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+_INPUT_SIZE       = 48
+_CALIBRATION_MAX  = 200   # images drawn from the calibration directory
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _calibration_inputs(calibration_dir):
+    """Yield (1, 48, 48, 1) float32 face crops from a directory of images."""
+    names = sorted(n for n in os.listdir(calibration_dir)
+                   if n.lower().endswith(_IMAGE_EXTENSIONS))[:_CALIBRATION_MAX]
+    for name in names:
+        img = cv2.imread(os.path.join(calibration_dir, name), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        img = cv2.resize(img, (_INPUT_SIZE, _INPUT_SIZE)).astype(np.float32) / 255.0
+        yield img[np.newaxis, :, :, np.newaxis]
+
+
+def convert(output_path, calibration_dir=None):
+    """Quantize the DeepFace emotion model and write it to output_path."""
+    import tensorflow as tf
+    from deepface import DeepFace
+
+    keras_model = DeepFace.build_model('Emotion', task='facial_attribute').model
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if calibration_dir:
+        converter.representative_dataset    = lambda: ([x] for x in _calibration_inputs(calibration_dir))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    mode = 'full INT8' if calibration_dir else 'dynamic-range INT8'
+    print(f"[tflite] Wrote {mode} emotion model → {output_path}")
+
+
+class TFLiteEmotionModel:
+    """Runs a converted emotion model through tf.lite.Interpreter."""
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        self._interpreter = tf.lite.Interpreter(model_path=model_path)
+        self._input       = self._interpreter.get_input_details()[0]['index']
+        self._output      = self._interpreter.get_output_details()[0]['index']
+        self._batch       = 0
+
+    def predict(self, batch):
+        """(N, 48, 48, 1) float32 → (N, 7) softmax probabilities."""
+        n = batch.shape[0]
+        if n != self._batch:
+            self._interpreter.resize_tensor_input(self._input, [n, _INPUT_SIZE, _INPUT_SIZE, 1])
+            self._interpreter.allocate_tensors()
+            self._batch = n
+        self._interpreter.set_tensor(self._input, batch.astype(np.float32, copy=False))
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m emotion_detection.tflite_emotion OUTPUT.tflite [CALIBRATION_DIR]")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
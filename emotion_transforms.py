@@ -13,6 +13,44 @@ EMOTION_COLORS_RGB: dict[str, tuple] = {
 }
 
 
+# Fixed emotion order for score vectors (emotion_weights, emotions_to_color_arr).
+# _PALETTE row i is the color of EMOTION_KEYS[i], so a weight vector in this
+# order can be blended with a single matmul instead of a per-emotion loop.
+EMOTION_KEYS  = ('neutral', 'happy', 'sad', 'angry', 'surprise', 'fear', 'disgust')
+_PALETTE      = np.array([EMOTION_COLORS_RGB[k] for k in EMOTION_KEYS], dtype=np.float32)
+_KEY_INDEX    = {k: i for i, k in enumerate(EMOTION_KEYS)}
+_NEUTRAL      = _KEY_INDEX['neutral']
+
+
+def emotion_weights(emotions_dict):
+    """
+    Pack an emotion dict into a float32 vector in EMOTION_KEYS order.
+
+    Keys are matched case-insensitively.  Unknown keys are counted as
+    neutral, whose palette color is white — the color unknown emotions
+    have always blended as.
+    """
+    weights = np.zeros(len(EMOTION_KEYS), dtype=np.float32)
+    for emotion, confidence in emotions_dict.items():
+        weights[_KEY_INDEX.get(emotion.lower(), _NEUTRAL)] += confidence
+    return weights
+
+
+def emotions_to_color_arr(weights):
+    """
+    Blend a weight vector in EMOTION_KEYS order into an RGB color.
+
+    Args:
+        weights: Array of length 7 with per-emotion weights as fractions
+                 (0-1), ordered like EMOTION_KEYS.
+
+    Returns:
+        tuple: (R, G, B) color values in range 0-255
+    """
+    rgb = np.clip(weights @ _PALETTE, 0, 255).astype(np.uint8)
+    return (int(rgb[0]), int(rgb[1]), int(rgb[2]))
+
+
 def emotions_to_color(emotions_dict):
     """
     Convert emotion confidence scores to a weighted RGB color.
@@ -25,15 +63,7 @@ def emotions_to_color(emotions_dict):
     Returns:
         tuple: (R, G, B) color values in range 0-255
     """
-    weighted_rgb = np.array([0.0, 0.0, 0.0])
-
-    for emotion, confidence in emotions_dict.items():
-        weight      = confidence / 100.0
-        emotion_rgb = np.array(EMOTION_COLORS_RGB.get(emotion.lower(), (255, 255, 255)))
-        weighted_rgb += emotion_rgb * weight
-
-    final_rgb = np.clip(weighted_rgb, 0, 255).astype(int)
-    return (int(final_rgb[0]), int(final_rgb[1]), int(final_rgb[2]))
+    return emotions_to_color_arr(emotion_weights(emotions_dict) * (1 / 100.0))
 
 
 def emotions_to_color_normalized(emotions_dict):
@@ -41,17 +71,10 @@ def emotions_to_color_normalized(emotions_dict):
     Convert emotions to color with normalized weighting.
     Useful if confidences don't sum to exactly 100.
     """
-    weighted_rgb     = np.array([0.0, 0.0, 0.0])
-    total_confidence = sum(emotions_dict.values())
+    weights = emotion_weights(emotions_dict)
+    total   = weights.sum()
 
-    if total_confidence == 0:
+    if total == 0:
         return (255, 255, 255)
 
-    for emotion, confidence in emotions_dict.items():
-        weight      = confidence / total_confidence
-        emotion_rgb = np.array(EMOTION_COLORS_RGB.get(emotion.lower(), (255, 255, 255)))
-        weighted_rgb += emotion_rgb * weight
-
-    final_rgb = np.clip(weighted_rgb, 0, 255).astype(int)
-    return (int(final_rgb[0]), int(final_rgb[1]), int(final_rgb[2]))
-
+    return emotions_to_color_arr(weights / total)
@@ -12,9 +12,6 @@ def format_dominant_emotion(emotions_dict):
         return ""
     
     # Find the emotion with the highest score
-    dominant_emotion = max(emotions_dict.items(), key=lambda x: x[1])[0]
+    dominant_emotion = max(emotions_dict, key=emotions_dict.__getitem__)
     
-    # Capitalize the emotion name
-    emotion_name = dominant_emotion.capitalize()
-    
-    return f"I am feeling {emotion_name}"
\ No newline at end of file
+    return f"I am feeling {dominant_emotion.capitalize()}"
\ No newline at end of file
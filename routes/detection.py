@@ -209,8 +209,7 @@ def stop_detection():
 
 @bp.route('/get_emotions', methods=['GET'])
 def get_emotions():
-    with _state.emotion_result_lock:
-        result = dict(_state.latest_emotion_result)
+    result = _state.latest_emotion_result
 
     face_data    = extract_face_detected(result)
     emotion_data = extract_all_emotions(result)
@@ -226,8 +225,7 @@ def get_emotions():
 
 @bp.route('/get_dominant_emotion_color', methods=['GET'])
 def get_dominant_emotion_color():
-    with _state.emotion_result_lock:
-        result = dict(_state.latest_emotion_result)
+    result = _state.latest_emotion_result
 
     face_data  = extract_face_detected(result)
     emot_data  = extract_dominant_emotion(result)
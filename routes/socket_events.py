@@ -57,8 +57,7 @@ def _emotion_broadcaster():
         with _state.emotion_condition:
             _state.emotion_condition.wait(timeout=1.0)
 
-        with _state.emotion_result_lock:
-            result = dict(_state.latest_emotion_result)
+        result = _state.latest_emotion_result
 
         faces = result.get('faces', [])
 
@@ -110,9 +109,7 @@ def on_emotion_disconnect():
     print(f"[socketio/emotion] disconnect  active_clients={_state.emotion_active_clients}")
 
     if _state.emotion_active_clients == 0 and not _state.emotion_explicitly_enabled:
-        with _state.emotion_result_lock:
-            _state.latest_emotion_result.clear()
-            _state.latest_emotion_result.update({'face_detected': False, 'faces': []})
+        _state.latest_emotion_result = {'face_detected': False, 'faces': []}
 
 
 # model_output streaming is handled by the raw WebSocket endpoint in routes/ws.py
@@ -6,9 +6,6 @@ Endpoints
 GET /video_feed              — raw MJPEG stream, no annotation
 GET /video_dominant_emotion  — MJPEG stream with per-face emotion overlay
 """
-import os
-import time
-
 import cv2
 import numpy as np
 from flask import Blueprint, Response
@@ -19,9 +16,7 @@ from routes.registry import FieldSpec, define
 
 bp = Blueprint('video', __name__)
 
-STREAM_JPEG_QUALITY   = int(os.environ.get('STREAM_JPEG_QUALITY', 70))
-_jpeg_params          = [cv2.IMWRITE_JPEG_QUALITY, STREAM_JPEG_QUALITY]
-_VIDEO_LOG_INTERVAL   = 30   # log every N frames (~1 s at 30 fps)
+_jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, _state.STREAM_JPEG_QUALITY]
 
 # ---------------------------------------------------------------------------
 # Route definitions
@@ -74,6 +69,19 @@ def _no_camera_frame_bytes() -> bytes:
     _, buf = cv2.imencode('.jpg', img)
     return buf.tobytes()
 
+def _stream_response(generator) -> Response:
+    """
+    Wrap a multipart frame generator in a Response that proxies won't buffer.
+
+    X-Accel-Buffering disables nginx response buffering and no-cache stops
+    intermediaries holding frames back, so each part reaches the browser as
+    soon as it is yielded.
+    """
+    resp = Response(generator, mimetype='multipart/x-mixed-replace; boundary=frame')
+    resp.headers['X-Accel-Buffering'] = 'no'
+    resp.headers['Cache-Control']     = 'no-cache'
+    return resp
+
 # ---------------------------------------------------------------------------
 # Handlers
 # ---------------------------------------------------------------------------
@@ -83,34 +91,35 @@ def video_feed():
     no_camera_frame = _no_camera_frame_bytes()
 
     def generate():
-        frame_count = 0
-        last_seq    = -1
-        while True:
-            with _state.frame_condition:
-                _state.frame_condition.wait_for(
-                    lambda: _state.frame_seq != last_seq, timeout=1.0
-                )
-                frame      = _state.latest_frame_flipped
-                last_seq   = _state.frame_seq
-                frame_age  = time.time() - _state.frame_timestamp if _state.frame_timestamp else 0
-
-            if frame is None:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + no_camera_frame + b'\r\n')
-                continue
+        # Frames are encoded once by the shared encoder thread in appv2.py;
+        # every client just forwards the published bytes.
+        with _state.jpeg_client_lock:
+            _state.jpeg_active_clients += 1
+
+        # Start from the current sequence so the first frame sent is one the
+        # encoder publishes for this client, not whatever was left over.
+        # If nothing new arrives within 1 s (stalled camera) the current JPEG
+        # is re-sent, which keeps the stream alive and lets a disconnected
+        # client be noticed on the next yield.
+        with _state.jpeg_condition:
+            last_seq = _state.jpeg_seq
+        try:
+            while True:
+                with _state.jpeg_condition:
+                    _state.jpeg_condition.wait_for(
+                        lambda: _state.jpeg_seq != last_seq, timeout=1.0
+                    )
+                    jpeg     = _state.latest_jpeg
+                    last_seq = _state.jpeg_seq
 
-            t_enc = time.time()
-            ret, buffer = cv2.imencode('.jpg', frame, _jpeg_params)
-            if ret:
+                # latest_jpeg is None when there is no camera frame.
                 yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-
-            frame_count += 1
-            if frame_count % _VIDEO_LOG_INTERVAL == 0:
-                encode_ms = (time.time() - t_enc) * 1000
-                print(f'[video_feed] #{frame_count}  frame_age={frame_age*1000:.0f}ms  encode={encode_ms:.1f}ms')
+                       b'Content-Type: image/jpeg\r\n\r\n' + (jpeg or no_camera_frame) + b'\r\n')
+        finally:
+            with _state.jpeg_client_lock:
+                _state.jpeg_active_clients = max(0, _state.jpeg_active_clients - 1)
 
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return _stream_response(generate())
 
 
 @bp.route('/video_dominant_emotion')
@@ -139,8 +148,7 @@ def video_dominant_emotion():
                            b'Content-Type: image/jpeg\r\n\r\n' + no_camera_frame + b'\r\n')
                     continue
 
-                with _state.emotion_result_lock:
-                    result = dict(_state.latest_emotion_result)
+                result = _state.latest_emotion_result
 
                 annotate_frame(frame, result)
 
@@ -155,11 +163,9 @@ def video_dominant_emotion():
                 _state.emotion_active_clients = max(0, _state.emotion_active_clients - 1)
             print(f"[emotion] Client disconnected active_clients={_state.emotion_active_clients}")
             if _state.emotion_active_clients == 0 and not _state.emotion_explicitly_enabled:
-                with _state.emotion_result_lock:
-                    _state.latest_emotion_result.clear()
-                    _state.latest_emotion_result.update({'face_detected': False, 'faces': []})
+                _state.latest_emotion_result = {'face_detected': False, 'faces': []}
 
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return _stream_response(generate())
 
 
 define(
@@ -202,8 +208,7 @@ def video_data_layer():
 
                 h, w = frame.shape[:2] if frame is not None else (480, 640)
 
-                with _state.emotion_result_lock:
-                    result = dict(_state.latest_emotion_result)
+                result = _state.latest_emotion_result
 
                 canvas = annotate_data_layer(result, h, w)
 
@@ -217,8 +222,6 @@ def video_data_layer():
                 _state.emotion_active_clients = max(0, _state.emotion_active_clients - 1)
             print(f"[data_layer] Client disconnected active_clients={_state.emotion_active_clients}")
             if _state.emotion_active_clients == 0 and not _state.emotion_explicitly_enabled:
-                with _state.emotion_result_lock:
-                    _state.latest_emotion_result.clear()
-                    _state.latest_emotion_result.update({'face_detected': False, 'faces': []})
+                _state.latest_emotion_result = {'face_detected': False, 'faces': []}
 
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return _stream_response(generate())
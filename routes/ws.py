@@ -49,8 +49,7 @@ from output_registry import DEFAULT_SCHEMA, DEFAULT_SPECS, run_extractors
 from routes.ollama import parse_modelfile
 from routes.registry import FieldSpec, define
 
-_VIDEO_JPEG_QUALITY = int(os.environ.get('STREAM_JPEG_QUALITY', 70))
-_jpeg_params        = [cv2.IMWRITE_JPEG_QUALITY, _VIDEO_JPEG_QUALITY]
+_jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, _state.STREAM_JPEG_QUALITY]
 
 sock = Sock()
 
@@ -137,8 +136,7 @@ def _stream(ws):
             # Reread schema on every frame — picks up set-config changes instantly.
             schema, specs = _active_schema()
 
-            with _state.emotion_result_lock:
-                result = dict(_state.latest_emotion_result)
+            result = _state.latest_emotion_result
 
             flat = run_extractors(result, specs)
             ws.send(schema.pack(flat))
@@ -182,13 +180,12 @@ def _video_stream(ws):
                 continue
 
             # Determine dominant-emotion colour for this frame.
-            with _state.emotion_result_lock:
-                result = _state.latest_emotion_result
-                faces  = result.get('faces', [])
-                if faces:
-                    bg_bgr = faces[0].get('emotion_color_bgr', (0, 0, 0))
-                else:
-                    bg_bgr = (0, 0, 0)
+            result = _state.latest_emotion_result
+            faces  = result.get('faces', [])
+            if faces:
+                bg_bgr = faces[0].get('emotion_color_bgr', (0, 0, 0))
+            else:
+                bg_bgr = (0, 0, 0)
 
             frame = get_background_remover().remove(frame, bg_color=bg_bgr)
             if faces:
@@ -397,8 +394,7 @@ def _data_layer_stream(ws):
 
             h, w = frame.shape[:2] if frame is not None else (480, 640)
 
-            with _state.emotion_result_lock:
-                result = dict(_state.latest_emotion_result)
+            result = _state.latest_emotion_result
 
             elapsed = time.monotonic() - start_time
 
@@ -5,28 +5,53 @@ Imported by appv2.py (which writes to it) and by the route blueprints
 (which read from it).  Keeping state here avoids circular imports and
 eliminates the need for `global` statements scattered across modules.
 """
+import os
 import threading
 
+# ---------------------------------------------------------------------------
+# Stream encoding
+# JPEG quality for every video encoder: _jpeg_encoder_loop in appv2.py and
+# the streams in routes/video.py and routes/ws.py.
+# ---------------------------------------------------------------------------
+STREAM_JPEG_QUALITY = int(os.environ.get('STREAM_JPEG_QUALITY', 70))
+
 # ---------------------------------------------------------------------------
 # Camera frame state
 # Written exclusively by _camera_reader_loop in appv2.py.
 # Read by streaming generators in routes/video.py.
 # ---------------------------------------------------------------------------
 frame_condition      = threading.Condition()
-latest_frame         = None
 latest_frame_flipped = None
 frame_timestamp      = 0.0
 frame_seq            = 0   # monotonically increments on every new frame
 
+# ---------------------------------------------------------------------------
+# Shared MJPEG encode state
+# Written exclusively by _jpeg_encoder_loop in appv2.py, which encodes each
+# camera frame once no matter how many /video_feed clients are watching.
+# latest_jpeg is None when no camera frame is available.
+# ---------------------------------------------------------------------------
+jpeg_condition      = threading.Condition()
+latest_jpeg         = None   # bytes | None
+jpeg_seq            = 0      # increments every time latest_jpeg is republished
+jpeg_active_clients = 0      # /video_feed generators currently streaming
+jpeg_client_lock    = threading.Lock()
+
 # ---------------------------------------------------------------------------
 # Emotion inference state
-# Written by _emotion_inference_loop in appv2.py.
-# Read by the video_dominant_emotion generator in routes/video.py.
+# Written exclusively by _emotion_inference_loop in appv2.py — the only caller
+# of EmotionDetector.detect_emotions_from_frame.  Every consumer (MJPEG
+# streams in routes/video.py, /ws streams, /get_emotions, the Socket.IO
+# broadcaster) draws the last published bboxes/colors from here instead of
+# running its own inference.
+#
+# Published by reference swap: writers assign a fully built dict and never
+# mutate it afterwards, so readers take the reference without a lock or copy
+# and must treat it as immutable.
 # ---------------------------------------------------------------------------
 latest_emotion_result = {'face_detected': False, 'faces': []}
-emotion_result_lock   = threading.Lock()
-# Notified (with emotion_result_lock NOT held) every time latest_emotion_result
-# is updated by the inference loop.  The Socket.IO broadcaster waits on this.
+# Notified every time latest_emotion_result is replaced by the inference loop.
+# The Socket.IO broadcaster waits on this.
 emotion_condition     = threading.Condition()
 
 # ---------------------------------------------------------------------------
@@ -36,7 +61,7 @@ emotion_condition     = threading.Condition()
 #   • emotion_active_clients > 0  — a client is connected to /video_dominant_emotion
 #   • emotion_explicitly_enabled  — /start_detection was called
 #
-# This avoids burning GPU/CPU on RetinaFace when nothing is consuming the results.
+# This avoids burning GPU/CPU on face detection when nothing is consuming the results.
 # ---------------------------------------------------------------------------
 emotion_active_clients    = 0               # incremented/decremented by the streaming generator
 emotion_client_lock       = threading.Lock()